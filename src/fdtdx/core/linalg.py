@@ -105,6 +105,30 @@ def rotate_vector(
     Returns:
         jax.Array: Rotated vector in global coordinates
     """
+    return rotate_vectors(vector[None, :], azimuth_angle, elevation_angle, axes_tuple)[0]
+
+
+def rotate_vectors(
+    vectors: jax.Array,
+    azimuth_angle: float | jax.Array,
+    elevation_angle: float | jax.Array,
+    axes_tuple: tuple[int, int, int],
+) -> jax.Array:
+    """Rotate several vectors by the same azimuth and elevation angles.
+
+    Batched version of rotate_vector. The rotation matrix is built once and applied to
+    all vectors with a single matrix product.
+
+    Args:
+        vectors (jax.Array): Input vectors to rotate, shape (N, 3)
+        azimuth_angle (float | jax.Array): Rotation angle around vertical axis in radians
+        elevation_angle (float | jax.Array): Rotation angle around horizontal axis in radians
+        axes_tuple (tuple[int, int, int]): tuple of axes specifying horizontal_axis, vertical_axis,
+            and propagation_axis.
+
+    Returns:
+        jax.Array: Rotated vectors in global coordinates, shape (N, 3)
+    """
 
     horizontal_axis, vertical_axis, propagation_axis = axes_tuple
 
@@ -137,12 +161,11 @@ def rotate_vector(
 
     rotation_basis = jnp.stack((u, v, w), axis=0)
 
-    # vector transformation
-    raw_vector = global_to_raw_basis @ vector
-    rotated = rotation_basis @ raw_vector
-    global_rotated = raw_to_global_basis @ rotated
+    # vector transformation: global -> raw basis, rotation, raw -> global basis
+    transform = raw_to_global_basis @ rotation_basis @ global_to_raw_basis
+    global_rotated = vectors @ transform.T
 
-    global_rotated = global_rotated / jnp.linalg.norm(global_rotated)
-    global_rotated = global_rotated * jnp.linalg.norm(vector)
+    global_rotated = global_rotated / jnp.linalg.norm(global_rotated, axis=-1, keepdims=True)
+    global_rotated = global_rotated * jnp.linalg.norm(vectors, axis=-1, keepdims=True)
 
     return global_rotated
@@ -6,6 +6,96 @@ from fdtdx.constants import c as c0
 from fdtdx.constants import eps0
 
 
+def _shift(field: jax.Array, shift: int, axis: int, periodic: bool) -> jax.Array:
+    """Returns the values f[i + shift] of a 3D field along an axis, for a shift of +1 or -1.
+
+    Like the finite differences, the result is the interior slice joined with a single boundary plane, which
+    wraps around for periodic boundaries and is zero for PEC boundaries.
+
+    Args:
+        field (jax.Array): 3D field component.
+        shift (int): Index offset of the neighbor, either 1 or -1.
+        axis (int): Axis along which the field is shifted.
+        periodic (bool): Whether the axis uses periodic boundaries.
+
+    Returns:
+        jax.Array: Shifted field with the same shape as the input.
+    """
+    n = field.shape[axis]
+    if shift > 0:
+        interior = jax.lax.slice_in_dim(field, 1, n, axis=axis)
+        boundary = jax.lax.slice_in_dim(field, 0, 1, axis=axis)
+    else:
+        interior = jax.lax.slice_in_dim(field, 0, n - 1, axis=axis)
+        boundary = jax.lax.slice_in_dim(field, n - 1, n, axis=axis)
+    if not periodic:
+        boundary = jnp.zeros_like(boundary)
+    if shift > 0:
+        return jnp.concatenate((interior, boundary), axis=axis)
+    return jnp.concatenate((boundary, interior), axis=axis)
+
+
+def _neighbor_sum(field: jax.Array, axis: int, periodic: bool) -> jax.Array:
+    """Computes the sum f[i - 1] + f[i + 1] of the two neighbors of every cell along an axis.
+
+    Args:
+        field (jax.Array): 3D field component.
+        axis (int): Axis along which the neighbors are summed.
+        periodic (bool): Whether the axis uses periodic boundaries.
+
+    Returns:
+        jax.Array: Neighbor sum with the same shape as the input.
+    """
+    return _shift(field, -1, axis=axis, periodic=periodic) + _shift(field, 1, axis=axis, periodic=periodic)
+
+
+def _forward_difference(field: jax.Array, axis: int, periodic: bool) -> jax.Array:
+    """Computes the forward difference f[i + 1] - f[i] of a 3D field along an axis.
+
+    The interior is a single slice subtraction and only the boundary plane is handled separately: its
+    neighbor wraps around to the first cell for periodic boundaries and is zero for PEC boundaries. Since
+    ``periodic`` is a static python bool, the boundary branch is resolved at trace time.
+
+    Args:
+        field (jax.Array): 3D field component.
+        axis (int): Axis along which the difference is computed.
+        periodic (bool): Whether the axis uses periodic boundaries.
+
+    Returns:
+        jax.Array: Forward difference with the same shape as the field.
+    """
+    n = field.shape[axis]
+    interior = jax.lax.slice_in_dim(field, 1, n, axis=axis) - jax.lax.slice_in_dim(field, 0, n - 1, axis=axis)
+    last = jax.lax.slice_in_dim(field, n - 1, n, axis=axis)
+    if periodic:
+        boundary = jax.lax.slice_in_dim(field, 0, 1, axis=axis) - last
+    else:
+        boundary = -last
+    return jnp.concatenate((interior, boundary), axis=axis)
+
+
+def _backward_difference(field: jax.Array, axis: int, periodic: bool) -> jax.Array:
+    """Computes the backward difference f[i] - f[i - 1] of a 3D field along an axis.
+
+    Args:
+        field (jax.Array): 3D field component.
+        axis (int): Axis along which the difference is computed.
+        periodic (bool): Whether the axis uses periodic boundaries. For PEC boundaries, the neighbor
+            of the first cell is zero.
+
+    Returns:
+        jax.Array: Backward difference with the same shape as the field.
+    """
+    n = field.shape[axis]
+    interior = jax.lax.slice_in_dim(field, 1, n, axis=axis) - jax.lax.slice_in_dim(field, 0, n - 1, axis=axis)
+    first = jax.lax.slice_in_dim(field, 0, 1, axis=axis)
+    if periodic:
+        boundary = first - jax.lax.slice_in_dim(field, n - 1, n, axis=axis)
+    else:
+        boundary = first
+    return jnp.concatenate((boundary, interior), axis=axis)
+
+
 def interpolate_fields(
     E_field: jax.Array,
     H_field: jax.Array,
@@ -34,38 +124,23 @@ def interpolate_fields(
         Uses PEC (Perfect Electric Conductor) boundary conditions where fields
         at boundaries are zero, unless periodic boundaries are specified.
     """
-    # Apply boundary conditions: PEC (zero) or periodic for each axis separately
-    for i, periodic in enumerate(periodic_axes):
-        pad_mode = "wrap" if periodic else "constant"
-        # Create padding tuple for current axis
-        if i == 0:
-            pad_width = ((0, 0), (1, 1), (0, 0), (0, 0))
-        elif i == 1:
-            pad_width = ((0, 0), (0, 0), (1, 1), (0, 0))
-        else:  # i == 2
-            pad_width = ((0, 0), (0, 0), (0, 0), (1, 1))
-        E_field = jnp.pad(E_field, pad_width, mode=pad_mode)
-        H_field = jnp.pad(H_field, pad_width, mode=pad_mode)
-
+    px, py, pz = periodic_axes
     E_x, E_y, E_z = E_field[0], E_field[1], E_field[2]
     H_x, H_y, H_z = H_field[0], H_field[1], H_field[2]
 
-    E_x = (E_x[1:-1, 1:-1, 1:-1] + E_x[1:-1, 1:-1, :-2] + E_x[2:, 1:-1, 1:-1] + E_x[2:, 1:-1, :-2]) / 4.0
-    E_y = (E_y[1:-1, 1:-1, 1:-1] + E_y[1:-1, :-2, 1:-1] + E_y[2:, 1:-1, 1:-1] + E_y[2:, :-2, 1:-1]) / 4.0
-    E_z = E_z[1:-1, 1:-1, 1:-1]  # leave as is since we project onto the E_z
-
-    H_x = (H_x[1:-1, 2:, 1:-1] + H_x[1:-1, :-2, 1:-1]) / 2.0
-    H_y = (H_y[1:-1, 1:-1, 2:] + H_y[1:-1, 1:-1, :-2]) / 2.0
-    H_z = (
-        H_z[:-2, 2:, 2:]
-        + H_z[:-2, 2:, :-2]
-        + H_z[:-2, :-2, 2:]
-        + H_z[:-2, :-2, :-2]
-        + H_z[2:, 2:, 2:]
-        + H_z[2:, 2:, :-2]
-        + H_z[2:, :-2, 2:]
-        + H_z[2:, :-2, :-2]
-    ) / 8.0
+    # every component only reads the neighbors it needs, no padded copies of the full fields.
+    # The stencils are separable, so multi-neighbor averages are built as successive pairwise sums.
+    E_x = E_x + _shift(E_x, -1, axis=2, periodic=pz)
+    E_x = (E_x + _shift(E_x, 1, axis=0, periodic=px)) * 0.25
+    E_y = E_y + _shift(E_y, -1, axis=1, periodic=py)
+    E_y = (E_y + _shift(E_y, 1, axis=0, periodic=px)) * 0.25
+    # leave E_z as is since we project onto the E_z
+
+    H_x = _neighbor_sum(H_x, axis=1, periodic=py) * 0.5
+    H_y = _neighbor_sum(H_y, axis=2, periodic=pz) * 0.5
+    H_z = _neighbor_sum(H_z, axis=0, periodic=px)
+    H_z = _neighbor_sum(H_z, axis=1, periodic=py)
+    H_z = _neighbor_sum(H_z, axis=2, periodic=pz) * 0.125
 
     # Constructing the interpolated fields
     E_interp = jnp.stack([E_x, E_y, E_z], axis=0)
@@ -111,26 +186,25 @@ def curl_E(
     Returns:
         jax.Array: The curl of E - an H-type field located on the faces of the grid
                   (half-integer grid points). Has same shape as input (3, nx, ny, nz).
+
+    Note:
+        Fields stored in a 16 bit floating point format are upcast to float32 for the computation.
+        The curl and the updated auxiliary fields are cast back to the dtypes of the inputs.
     """
-    # Pad each axis separately based on boundary conditions
-    E_pad = E
-    for i, periodic in enumerate(periodic_axes):
-        pad_mode = "wrap" if periodic else "constant"
-        # Create padding tuple for current axis
-        if i == 0:
-            pad_width = ((0, 0), (1, 1), (0, 0), (0, 0))
-        elif i == 1:
-            pad_width = ((0, 0), (0, 0), (1, 1), (0, 0))
-        else:  # i == 2
-            pad_width = ((0, 0), (0, 0), (0, 0), (1, 1))
-        E_pad = jnp.pad(E_pad, pad_width, mode=pad_mode)
-
-    dyEz = (jnp.roll(E_pad[2], -1, axis=1) - E_pad[2])[1:-1, 1:-1, 1:-1]
-    dzEy = (jnp.roll(E_pad[1], -1, axis=2) - E_pad[1])[1:-1, 1:-1, 1:-1]
-    dzEx = (jnp.roll(E_pad[0], -1, axis=2) - E_pad[0])[1:-1, 1:-1, 1:-1]
-    dxEz = (jnp.roll(E_pad[2], -1, axis=0) - E_pad[2])[1:-1, 1:-1, 1:-1]
-    dxEy = (jnp.roll(E_pad[1], -1, axis=0) - E_pad[1])[1:-1, 1:-1, 1:-1]
-    dyEx = (jnp.roll(E_pad[0], -1, axis=1) - E_pad[0])[1:-1, 1:-1, 1:-1]
+    px, py, pz = periodic_axes
+
+    # 16 bit fields are only used for storage, the stencil and PML update are evaluated in float32
+    storage_dtype, psi_dtype = E.dtype, psi_H.dtype
+    upcast = jnp.promote_types(storage_dtype, jnp.float32) != storage_dtype
+    if upcast:
+        E, psi_H, alpha, kappa, sigma = (arr.astype(jnp.float32) for arr in (E, psi_H, alpha, kappa, sigma))
+
+    dyEz = _forward_difference(E[2], axis=1, periodic=py)
+    dzEy = _forward_difference(E[1], axis=2, periodic=pz)
+    dzEx = _forward_difference(E[0], axis=2, periodic=pz)
+    dxEz = _forward_difference(E[2], axis=0, periodic=px)
+    dxEy = _forward_difference(E[1], axis=0, periodic=px)
+    dyEx = _forward_difference(E[0], axis=1, periodic=py)
 
     # Auxiliary fields
     psi_Hxy = psi_H[0, :, :, :]
@@ -206,11 +280,16 @@ def curl_E(
 
     psi_H_updated = jnp.stack((psi_Hxy, psi_Hxz, psi_Hyz, psi_Hyx, psi_Hzx, psi_Hzy), axis=0)
 
-    curl_x = (1.0 / kappa[1, :, :, :] * dyEz + psi_Hxy) - (1.0 / kappa[2, :, :, :] * dzEy + psi_Hxz)
-    curl_y = (1.0 / kappa[2, :, :, :] * dzEx + psi_Hyz) - (1.0 / kappa[0, :, :, :] * dxEz + psi_Hyx)
-    curl_z = (1.0 / kappa[0, :, :, :] * dxEy + psi_Hzx) - (1.0 / kappa[1, :, :, :] * dyEx + psi_Hzy)
+    # one reciprocal per axis, shared by both derivatives along that axis
+    inv_kappa = 1.0 / kappa[:3]
+    curl_x = (inv_kappa[1] * dyEz + psi_Hxy) - (inv_kappa[2] * dzEy + psi_Hxz)
+    curl_y = (inv_kappa[2] * dzEx + psi_Hyz) - (inv_kappa[0] * dxEz + psi_Hyx)
+    curl_z = (inv_kappa[0] * dxEy + psi_Hzx) - (inv_kappa[1] * dyEx + psi_Hzy)
     curl = jnp.stack((curl_x, curl_y, curl_z), axis=0)
 
+    if upcast:
+        curl, psi_H_updated = curl.astype(storage_dtype), psi_H_updated.astype(psi_dtype)
+
     return curl, psi_H_updated
 
 
@@ -251,26 +330,25 @@ def curl_H(
     Returns:
         jax.Array: The curl of H - an E-type field located on the edges of the grid
                   (integer grid points). Has same shape as input (3, nx, ny, nz).
+
+    Note:
+        Fields stored in a 16 bit floating point format are upcast to float32 for the computation.
+        The curl and the updated auxiliary fields are cast back to the dtypes of the inputs.
     """
-    # Pad each axis separately based on boundary conditions
-    H_pad = H
-    for i, periodic in enumerate(periodic_axes):
-        pad_mode = "wrap" if periodic else "constant"
-        # Create padding tuple for current axis
-        if i == 0:
-            pad_width = ((0, 0), (1, 1), (0, 0), (0, 0))
-        elif i == 1:
-            pad_width = ((0, 0), (0, 0), (1, 1), (0, 0))
-        else:  # i == 2
-            pad_width = ((0, 0), (0, 0), (0, 0), (1, 1))
-        H_pad = jnp.pad(H_pad, pad_width, mode=pad_mode)
-
-    dyHz = (H_pad[2] - jnp.roll(H_pad[2], 1, axis=1))[1:-1, 1:-1, 1:-1]
-    dzHy = (H_pad[1] - jnp.roll(H_pad[1], 1, axis=2))[1:-1, 1:-1, 1:-1]
-    dzHx = (H_pad[0] - jnp.roll(H_pad[0], 1, axis=2))[1:-1, 1:-1, 1:-1]
-    dxHz = (H_pad[2] - jnp.roll(H_pad[2], 1, axis=0))[1:-1, 1:-1, 1:-1]
-    dxHy = (H_pad[1] - jnp.roll(H_pad[1], 1, axis=0))[1:-1, 1:-1, 1:-1]
-    dyHx = (H_pad[0] - jnp.roll(H_pad[0], 1, axis=1))[1:-1, 1:-1, 1:-1]
+    px, py, pz = periodic_axes
+
+    # 16 bit fields are only used for storage, the stencil and PML update are evaluated in float32
+    storage_dtype, psi_dtype = H.dtype, psi_E.dtype
+    upcast = jnp.promote_types(storage_dtype, jnp.float32) != storage_dtype
+    if upcast:
+        H, psi_E, alpha, kappa, sigma = (arr.astype(jnp.float32) for arr in (H, psi_E, alpha, kappa, sigma))
+
+    dyHz = _backward_difference(H[2], axis=1, periodic=py)
+    dzHy = _backward_difference(H[1], axis=2, periodic=pz)
+    dzHx = _backward_difference(H[0], axis=2, periodic=pz)
+    dxHz = _backward_difference(H[2], axis=0, periodic=px)
+    dxHy = _backward_difference(H[1], axis=0, periodic=px)
+    dyHx = _backward_difference(H[0], axis=1, periodic=py)
 
     # Auxiliary fields
     psi_Exy = psi_E[0, :, :, :]
@@ -346,9 +424,14 @@ def curl_H(
 
     psi_E_updated = jnp.stack((psi_Exy, psi_Exz, psi_Eyz, psi_Eyx, psi_Ezx, psi_Ezy), axis=0)
 
-    curl_x = (1.0 / kappa[1, :, :, :] * dyHz + psi_Exy) - (1.0 / kappa[2, :, :, :] * dzHy + psi_Exz)
-    curl_y = (1.0 / kappa[2, :, :, :] * dzHx + psi_Eyz) - (1.0 / kappa[0, :, :, :] * dxHz + psi_Eyx)
-    curl_z = (1.0 / kappa[0, :, :, :] * dxHy + psi_Ezx) - (1.0 / kappa[1, :, :, :] * dyHx + psi_Ezy)
+    # one reciprocal per axis, shared by both derivatives along that axis
+    inv_kappa = 1.0 / kappa[:3]
+    curl_x = (inv_kappa[1] * dyHz + psi_Exy) - (inv_kappa[2] * dzHy + psi_Exz)
+    curl_y = (inv_kappa[2] * dzHx + psi_Eyz) - (inv_kappa[0] * dxHz + psi_Eyx)
+    curl_z = (inv_kappa[0] * dxHy + psi_Ezx) - (inv_kappa[1] * dyHx + psi_Ezy)
     curl = jnp.stack((curl_x, curl_y, curl_z), axis=0)
 
+    if upcast:
+        curl, psi_E_updated = curl.astype(storage_dtype), psi_E_updated.astype(psi_dtype)
+
     return curl, psi_E_updated
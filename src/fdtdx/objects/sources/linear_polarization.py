@@ -1,16 +1,217 @@
 from abc import ABC, abstractmethod
+from functools import partial
+from typing import Literal
 
 import jax
 import jax.numpy as jnp
+import numpy as np
 
 from fdtdx.core.grid import calculate_time_offset_yee
 from fdtdx.core.jax.pytrees import autoinit, frozen_field
-from fdtdx.core.linalg import get_wave_vector_raw, rotate_vector
-from fdtdx.core.misc import linear_interpolated_indexing, normalize_polarization_for_source
+from fdtdx.core.linalg import get_wave_vector_raw, rotate_vectors
+from fdtdx.core.misc import normalize_polarization_for_source
 from fdtdx.core.physics.metrics import compute_energy
 from fdtdx.objects.sources.tfsf import TFSFPlaneSource
 
 
+def _plane_indices(width: int, height: int) -> np.ndarray:
+    """Returns the flattened integer coordinates of all points in a source plane.
+
+    Built with NumPy from static shapes, such that the coordinates are a compile-time constant
+    of the jitted field computation instead of a meshgrid evaluated on every call.
+
+    Args:
+        width (int): Number of grid points along the horizontal axis.
+        height (int): Number of grid points along the vertical axis.
+
+    Returns:
+        np.ndarray: Coordinates in row-major ("ij") order, shape (width * height, 2).
+    """
+    w, h = np.meshgrid(np.arange(width), np.arange(height), indexing="ij")
+    return np.stack((w, h), axis=-1).reshape(-1, 2).astype(np.float32)
+
+
+def _plane_basis(wave_vector: jax.Array, propagation_axis: int) -> tuple[jax.Array, jax.Array]:
+    """Computes the orthonormal basis (u, v) of the plane orthogonal to a (tilted) wave vector.
+
+    u is the horizontal axis projected onto the plane and v = k x u. Since u lies in the span of the horizontal
+    axis and the wave vector, the cross product reduces to (k x e_h) / |e_h - k_h k|. With the horizontal and
+    vertical axis following the propagation axis cyclically, this has no horizontal component, a vertical
+    component k_p / |e_h - k_h k| and a propagation component -k_v / |e_h - k_h k|.
+
+    Args:
+        wave_vector (jax.Array): Normalized wave vector, shape (3,).
+        propagation_axis (int): Axis of propagation of the untilted source.
+
+    Returns:
+        tuple[jax.Array, jax.Array]: u and v basis vectors, each of shape (3,).
+    """
+    horizontal_axis = (propagation_axis + 1) % 3
+    vertical_axis = (propagation_axis + 2) % 3
+    h_list = [0, 0, 0]
+    h_list[horizontal_axis] = 1
+    h_axis = jnp.asarray(h_list, dtype=jnp.float32)
+    u_basis = h_axis - wave_vector[horizontal_axis] * wave_vector
+    u_norm = jnp.linalg.norm(u_basis)
+    u_basis = u_basis / u_norm
+    v_basis = jnp.zeros((3,), dtype=jnp.float32)
+    v_basis = v_basis.at[vertical_axis].set(wave_vector[propagation_axis] / u_norm)
+    v_basis = v_basis.at[propagation_axis].set(-wave_vector[vertical_axis] / u_norm)
+    return u_basis, v_basis
+
+
+@partial(
+    jax.jit,
+    static_argnames=(
+        "grid_shape",
+        "propagation_axis",
+        "direction",
+        "fixed_E_polarization_vector",
+        "fixed_H_polarization_vector",
+        "normalize_by_energy",
+        "resolution",
+        "time_step_duration",
+        "field_dtype",
+    ),
+)
+def _compute_EH(
+    center: jax.Array,
+    azimuth: jax.Array,
+    elevation: jax.Array,
+    amplitude_raw: jax.Array,
+    inv_permittivities: jax.Array,
+    inv_permeabilities: jax.Array | float,
+    *,
+    grid_shape: tuple[int, int, int],
+    propagation_axis: int,
+    direction: Literal["+", "-"],
+    fixed_E_polarization_vector: tuple[float, float, float] | None,
+    fixed_H_polarization_vector: tuple[float, float, float] | None,
+    normalize_by_energy: bool,
+    resolution: float,
+    time_step_duration: float,
+    field_dtype: jnp.dtype,
+) -> tuple[jax.Array, jax.Array, jax.Array, jax.Array]:
+    """Computes the E/H fields and time offsets of a linearly polarized plane source.
+
+    Compiled once per source configuration, such that repeated evaluations (e.g. for new random keys)
+    do not trace the projection, interpolation and normalization again.
+
+    Args:
+        center (jax.Array): Center of the source in the propagation plane in grid coordinates, in
+            (horizontal, vertical) order, shape (2,).
+        azimuth (jax.Array): Azimuth angle in radians.
+        elevation (jax.Array): Elevation angle in radians.
+        amplitude_raw (jax.Array): Amplitude profile of the source in normal coordinates, shape (*grid_shape).
+            A scalar amplitude denotes a spatially uniform profile.
+        inv_permittivities (jax.Array): Inverse permittivities at the source location, shape (*grid_shape).
+        inv_permeabilities (jax.Array | float): Inverse permeabilities at the source location.
+        grid_shape (tuple[int, int, int]): Grid shape of the source.
+        propagation_axis (int): Axis of propagation. Horizontal and vertical axis follow cyclically, as in
+            DirectionalPlaneSourceBase.
+        direction (Literal["+", "-"]): Direction of propagation along the propagation axis.
+        fixed_E_polarization_vector (tuple[float, float, float] | None): Fixed electric polarization.
+        fixed_H_polarization_vector (tuple[float, float, float] | None): Fixed magnetic polarization.
+        normalize_by_energy (bool): Whether to normalize the fields by their total energy.
+        resolution (float): Spatial resolution of the simulation.
+        time_step_duration (float): Duration of a single time step.
+        field_dtype (jnp.dtype): Data type of the E and H fields. Interpolation and time offsets always use float32.
+
+    Returns:
+        tuple[jax.Array, jax.Array, jax.Array, jax.Array]: E, H, time_offset_E and time_offset_H,
+            each of shape (3, *grid_shape).
+    """
+    # determine E/H polarization
+    e_pol_raw, h_pol_raw = normalize_polarization_for_source(
+        direction=direction,
+        propagation_axis=propagation_axis,
+        fixed_E_polarization_vector=fixed_E_polarization_vector,
+        fixed_H_polarization_vector=fixed_H_polarization_vector,
+    )
+    wave_vector_raw = get_wave_vector_raw(
+        direction=direction,
+        propagation_axis=propagation_axis,
+    )
+
+    # (horizontal, vertical, propagation) is always a cyclic order of (x, y, z), the closed form basis relies on it
+    horizontal_axis = (propagation_axis + 1) % 3
+    vertical_axis = (propagation_axis + 2) % 3
+
+    # tilt polarizations
+    axes_tpl = (horizontal_axis, vertical_axis, propagation_axis)
+    raw_vectors = jnp.stack((wave_vector_raw, e_pol_raw, h_pol_raw), axis=0)
+    wave_vector, e_pol, h_pol = rotate_vectors(raw_vectors, azimuth, elevation, axes_tpl)
+
+    # The plane is handled in ascending axis order, the memory order of amplitude_raw and of the returned fields.
+    # For propagation along y, the horizontal axis (z) comes after the vertical axis (x). In that case, the center
+    # and the (u, v) basis, which are given in (horizontal, vertical) order, are swapped.
+    plane_axes = sorted((horizontal_axis, vertical_axis))
+    plane_shape = tuple(grid_shape[a] for a in plane_axes)
+    swap_plane_axes = horizontal_axis > vertical_axis
+    plane_center = center[::-1] if swap_plane_axes else center
+    if amplitude_raw.ndim != 0 and amplitude_raw.shape != grid_shape:
+        raise Exception(f"Amplitude profile of shape {amplitude_raw.shape} does not match source shape {grid_shape}")
+
+    # map amplitude to propagation plane
+    wh_indices = _plane_indices(*plane_shape)
+    # basis in plane
+    u_basis, v_basis = _plane_basis(wave_vector, propagation_axis)
+
+    # project all points onto the plane orthogonal to the wave vector and convert to plane coordinates.
+    # Since u and v are orthogonal to the wave vector, the projection does not change the dot products with them
+    # and only the (2, 2) block of the basis belonging to the plane axes is needed.
+    plane_vectors = (v_basis, u_basis) if swap_plane_axes else (u_basis, v_basis)
+    plane_basis = jnp.stack(plane_vectors, axis=1)[plane_axes, :]
+    # (indices - center) @ basis + center, with the center folded into a single offset vector
+    center_offset = plane_center - plane_center @ plane_basis
+    float_projected = wh_indices @ plane_basis + center_offset
+    # interpolate floating indices in original array. Out of bounds neighbors are ignored by renormalizing
+    # with the interpolated valid mask, points without any valid neighbor evaluate to zero.
+    coordinates = [float_projected[:, 0], float_projected[:, 1]]
+    valid_weight = jax.scipy.ndimage.map_coordinates(
+        jnp.ones(plane_shape, dtype=jnp.float32), coordinates, order=1, mode="constant"
+    )
+    if amplitude_raw.ndim == 0:
+        # uniform amplitude, interpolation reduces to the valid mask
+        interp = amplitude_raw * valid_weight
+    else:
+        plane_amplitude = amplitude_raw.reshape(plane_shape)
+        interp = jax.scipy.ndimage.map_coordinates(plane_amplitude, coordinates, order=1, mode="constant")
+    interp = interp / (valid_weight + 1e-8)
+    amplitude = interp.reshape(grid_shape).astype(field_dtype)
+
+    e_pol = e_pol.astype(field_dtype)
+    h_pol = h_pol.astype(field_dtype)
+
+    if normalize_by_energy:
+        energy = compute_energy(
+            E=amplitude[None, ...] * e_pol[:, None, None, None],
+            H=amplitude[None, ...] * h_pol[:, None, None, None],
+            inv_permittivity=inv_permittivities,
+            inv_permeability=inv_permeabilities,
+        )
+        total_energy_root = jnp.sqrt(energy.sum()).astype(field_dtype)
+        e_pol = e_pol / total_energy_root
+        h_pol = h_pol / total_energy_root
+
+    # update is amplitude multiplied by polarization, H is additionally scaled by the reciprocal impedance of
+    # the medium. Scalar factors live in the polarization vectors, such that E and H are each written once.
+    inv_impedance = jax.lax.rsqrt(inv_permittivities / inv_permeabilities).astype(field_dtype)
+    E = amplitude[None, ...] * e_pol[:, None, None, None]
+    H = (amplitude * inv_impedance)[None, ...] * h_pol[:, None, None, None]
+
+    time_offset_E, time_offset_H = calculate_time_offset_yee(
+        center=plane_center,
+        wave_vector=wave_vector,
+        inv_permittivities=inv_permittivities,
+        inv_permeabilities=inv_permeabilities,
+        resolution=resolution,
+        time_step_duration=time_step_duration,
+    )
+
+    return E, H, time_offset_E, time_offset_H
+
+
 @autoinit
 class LinearlyPolarizedPlaneSource(TFSFPlaneSource, ABC):
     #: the electric polarization vector
@@ -22,6 +223,9 @@ class LinearlyPolarizedPlaneSource(TFSFPlaneSource, ABC):
     #: whether to normalize the polarization vector
     normalize_by_energy: bool = frozen_field(default=True)
 
+    #: data type of the incident E and H fields, e.g. jnp.bfloat16 to halve their memory footprint
+    field_dtype: jnp.dtype = frozen_field(default=jnp.float32)
+
     def get_EH_variation(
         self,
         key: jax.Array,
@@ -37,97 +241,32 @@ class LinearlyPolarizedPlaneSource(TFSFPlaneSource, ABC):
         if isinstance(inv_permeabilities, jax.Array) and inv_permeabilities.ndim > 0:
             inv_permeabilities = inv_permeabilities[*self.grid_slice]
 
-        # determine E/H polarization
-        e_pol_raw, h_pol_raw = normalize_polarization_for_source(
-            direction=self.direction,
+        center, azimuth, elevation = self._get_random_parts(key)
+        amplitude_raw = self._get_amplitude_raw(center)
+
+        return _compute_EH(
+            center,
+            azimuth,
+            elevation,
+            amplitude_raw,
+            inv_permittivities,
+            inv_permeabilities,
+            grid_shape=self.grid_shape,
             propagation_axis=self.propagation_axis,
+            direction=self.direction,
             fixed_E_polarization_vector=self.fixed_E_polarization_vector,
             fixed_H_polarization_vector=self.fixed_H_polarization_vector,
-        )
-        wave_vector_raw = get_wave_vector_raw(
-            direction=self.direction,
-            propagation_axis=self.propagation_axis,
-        )
-
-        center, azimuth, elevation = self._get_random_parts(key)
-
-        # tilt polarizations
-        axes_tpl = (self.horizontal_axis, self.vertical_axis, self.propagation_axis)
-        wave_vector = rotate_vector(wave_vector_raw, azimuth, elevation, axes_tpl)
-        e_pol = rotate_vector(e_pol_raw, azimuth, elevation, axes_tpl)
-        h_pol = rotate_vector(h_pol_raw, azimuth, elevation, axes_tpl)
-
-        # update is amplitude multiplied by polarization
-        amplitude_raw = self._get_amplitude_raw(center)[None, ...]
-
-        # map amplitude to propagation plane
-        w, h = jnp.meshgrid(
-            jnp.arange(self.grid_shape[self.horizontal_axis]),
-            jnp.arange(self.grid_shape[self.vertical_axis]),
-            indexing="ij",
-        )
-        wh_indices = jnp.stack((w, h), axis=-1)
-        wh_indices -= center
-        # basis in plane
-        h_list = [0, 0, 0]
-        h_list[self.horizontal_axis] = 1
-        h_axis = jnp.asarray(h_list, dtype=jnp.float32)
-        u_basis = h_axis - jnp.dot(h_axis, wave_vector) * wave_vector
-        u_basis = u_basis / jnp.linalg.norm(u_basis)
-        v_basis = jnp.cross(wave_vector, u_basis)
-
-        # projection
-        def project(point):
-            point_list = [point[0], point[1]]
-            point_list.insert(self.propagation_axis, 0)
-            point = jnp.asarray(point_list, dtype=jnp.float32)
-            projection = point - jnp.dot(point, wave_vector) * wave_vector
-            # Convert to plane coordinates
-            u = jnp.dot(projection, u_basis)
-            v = jnp.dot(projection, v_basis)
-            return jnp.asarray((u, v), dtype=jnp.float32)
-
-        float_projected = jax.vmap(project)(wh_indices.reshape(-1, 2))
-        float_projected += center
-        # interpolate floating indices in original array
-        index_fn = jax.vmap(linear_interpolated_indexing, in_axes=(0, None))
-        interp = index_fn(float_projected, amplitude_raw.squeeze())
-        amplitude = interp.reshape(*amplitude_raw.shape)
-
-        E = amplitude * e_pol[:, None, None, None]
-        H = amplitude * h_pol[:, None, None, None]
-
-        if self.normalize_by_energy:
-            energy = compute_energy(
-                E=E,
-                H=H,
-                inv_permittivity=inv_permittivities,
-                inv_permeability=inv_permeabilities,
-            )
-            total_energy_root = jnp.sqrt(energy.sum())
-            E = E / total_energy_root
-            H = H / total_energy_root
-
-        # adjust H for impedance of the medium
-        impedance = jnp.sqrt(inv_permittivities / inv_permeabilities)
-        H = H / impedance
-
-        time_offset_E, time_offset_H = calculate_time_offset_yee(
-            center=center,
-            wave_vector=wave_vector,
-            inv_permittivities=inv_permittivities,
-            inv_permeabilities=inv_permeabilities,
+            normalize_by_energy=self.normalize_by_energy,
             resolution=self._config.resolution,
             time_step_duration=self._config.time_step_duration,
+            field_dtype=self.field_dtype,
         )
 
-        return E, H, time_offset_E, time_offset_H
-
     @abstractmethod
     def _get_amplitude_raw(
         self,
         center: jax.Array,
-    ) -> jax.Array:  # shape (*grid_shape)
+    ) -> jax.Array:  # shape (*grid_shape) or () for a uniform amplitude
         # in normal coordinates, not yee grid
         del center
         raise NotImplementedError()
@@ -142,6 +281,7 @@ class GaussianPlaneSource(LinearlyPolarizedPlaneSource):
     std: float = frozen_field(default=1 / 3)  # relative to radius
 
     @staticmethod
+    @partial(jax.jit, static_argnames=("width", "height", "axis", "radii", "std"))
     def _gauss_profile(
         width: int,
         height: int,
@@ -150,18 +290,15 @@ class GaussianPlaneSource(LinearlyPolarizedPlaneSource):
         radii: tuple[float, float],
         std: float,
     ) -> jax.Array:  # shape (*grid_shape)
-        grid = (
-            jnp.stack(jnp.meshgrid(*map(jnp.arange, (height, width)), indexing="xy"), axis=-1) - jnp.asarray(center)
-        ) / jnp.asarray(radii)
-        euc_dist = (grid**2).sum(axis=-1)
-
-        mask = euc_dist < 1
-        mask = jnp.expand_dims(mask, axis=axis)
-
-        exp_part = jnp.exp(-0.5 * euc_dist / std**2)
-        exp_part = jnp.expand_dims(exp_part, axis=axis)
-
-        profile = jnp.where(mask, exp_part, 0)
+        # compiled once per source geometry, only the (randomly offset) center is traced
+        # separable squared distance of shape (width, height), without materializing a stacked coordinate grid
+        center = jnp.asarray(center)
+        rows = jnp.arange(width)[:, None]
+        cols = jnp.arange(height)[None, :]
+        euc_dist = ((cols - center[0]) / radii[0]) ** 2 + ((rows - center[1]) / radii[1]) ** 2
+
+        profile = jnp.where(euc_dist < 1, jnp.exp(-0.5 * euc_dist / std**2), 0)
+        profile = jnp.expand_dims(profile, axis=axis)
         profile = profile / profile.sum()
 
         return profile
@@ -171,9 +308,11 @@ class GaussianPlaneSource(LinearlyPolarizedPlaneSource):
         center: jax.Array,
     ) -> jax.Array:
         grid_radius = self.radius / self._config.resolution
+        # the profile is laid out in ascending axis order, such that it has the shape of the source
+        first_axis, second_axis = sorted((self.horizontal_axis, self.vertical_axis))
         profile = self._gauss_profile(
-            width=self.grid_shape[self.horizontal_axis],
-            height=self.grid_shape[self.vertical_axis],
+            width=self.grid_shape[first_axis],
+            height=self.grid_shape[second_axis],
             axis=self.propagation_axis,
             center=center,
             radii=(grid_radius, grid_radius),
@@ -192,5 +331,5 @@ class UniformPlaneSource(LinearlyPolarizedPlaneSource):
         center: jax.Array,
     ) -> jax.Array:
         del center
-        profile = jnp.ones(shape=self.grid_shape, dtype=jnp.float32)
-        return self.amplitude * profile
+        # no need to materialize a constant profile, it is broadcast during interpolation
+        return jnp.asarray(self.amplitude, dtype=jnp.float32)
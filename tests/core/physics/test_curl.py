@@ -1,4 +1,7 @@
+import itertools
+
 import jax.numpy as jnp
+import numpy as np
 
 from fdtdx.config import SimulationConfig
 from fdtdx.core.physics.curl import curl_E, curl_H, interpolate_fields
@@ -69,6 +72,74 @@ def test_interpolate_fields_zero_fields():
     assert jnp.allclose(H_interp, 0.0)
 
 
+def _reference_interpolate_fields(
+    E_field: np.ndarray,
+    H_field: np.ndarray,
+    periodic_axes: tuple[bool, bool, bool],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Interpolation onto E_z computed from explicitly padded fields."""
+    for axis, periodic in enumerate(periodic_axes):
+        pad_width = [(0, 0)] + [(1, 1) if a == axis else (0, 0) for a in range(3)]
+        mode = "wrap" if periodic else "constant"
+        E_field = np.pad(E_field, pad_width, mode=mode)
+        H_field = np.pad(H_field, pad_width, mode=mode)
+    E_x, E_y, E_z = E_field
+    H_x, H_y, H_z = H_field
+
+    E_x = (E_x[1:-1, 1:-1, 1:-1] + E_x[1:-1, 1:-1, :-2] + E_x[2:, 1:-1, 1:-1] + E_x[2:, 1:-1, :-2]) / 4.0
+    E_y = (E_y[1:-1, 1:-1, 1:-1] + E_y[1:-1, :-2, 1:-1] + E_y[2:, 1:-1, 1:-1] + E_y[2:, :-2, 1:-1]) / 4.0
+    E_z = E_z[1:-1, 1:-1, 1:-1]
+
+    H_x = (H_x[1:-1, 2:, 1:-1] + H_x[1:-1, :-2, 1:-1]) / 2.0
+    H_y = (H_y[1:-1, 1:-1, 2:] + H_y[1:-1, 1:-1, :-2]) / 2.0
+    H_z = sum(H_z[x, y, z] for x, y, z in itertools.product((slice(None, -2), slice(2, None)), repeat=3)) / 8.0
+    return np.stack([E_x, E_y, E_z], axis=0), np.stack([H_x, H_y, H_z], axis=0)
+
+
+def test_interpolate_fields_matches_padded_reference_for_all_boundaries():
+    """Test interpolate_fields against explicit padding for every periodic/PEC axis combination."""
+    rng = np.random.default_rng(7)
+    for shape in ((4, 5, 6), (5, 1, 3)):
+        E_field = rng.normal(size=(3, *shape)).astype(np.float32)
+        H_field = rng.normal(size=(3, *shape)).astype(np.float32)
+
+        for periodic_axes in itertools.product((False, True), repeat=3):
+            E_interp, H_interp = interpolate_fields(jnp.asarray(E_field), jnp.asarray(H_field), periodic_axes)
+            E_ref, H_ref = _reference_interpolate_fields(E_field, H_field, periodic_axes)
+
+            assert E_interp.shape == E_ref.shape == (3, *shape)
+            assert np.allclose(E_interp, E_ref, atol=1e-6)
+            assert np.allclose(H_interp, H_ref, atol=1e-6)
+
+
+def test_interpolate_fields_impulse_response():
+    """Test the stencil offsets and averaging weights of every component with a single interior impulse."""
+    shape = (4, 5, 6)
+    point = (1, 2, 3)
+    # output cells receiving the impulse and their weight, per component of E and H
+    expected_E = [
+        (itertools.product((0, 1), (2,), (3, 4)), 0.25),
+        (itertools.product((0, 1), (2, 3), (3,)), 0.25),
+        ([point], 1.0),
+    ]
+    expected_H = [
+        (itertools.product((1,), (1, 3), (3,)), 0.5),
+        (itertools.product((1,), (2,), (2, 4)), 0.5),
+        (itertools.product((0, 2), (1, 3), (2, 4)), 0.125),
+    ]
+
+    for component in range(3):
+        impulse = np.zeros((3, *shape), dtype=np.float32)
+        impulse[(component, *point)] = 1.0
+        E_interp, H_interp = interpolate_fields(jnp.asarray(impulse), jnp.asarray(impulse))
+
+        for interp, (cells, weight) in ((E_interp, expected_E[component]), (H_interp, expected_H[component])):
+            expected = np.zeros((3, *shape), dtype=np.float32)
+            for cell in cells:
+                expected[(component, *cell)] = weight
+            assert np.array_equal(np.asarray(interp), expected)
+
+
 def test_curl_E_uniform_field():
     """Test curl_E with uniform electric field (should give zero curl)."""
     E = jnp.ones((3, 5, 5, 5))
@@ -315,3 +386,85 @@ def test_curl_reciprocity():
     assert double_curl.shape == (3, 6, 6, 6)
     assert jnp.all(jnp.isfinite(curl_E_result))
     assert jnp.all(jnp.isfinite(double_curl))
+
+
+def _reference_curl(field: np.ndarray, periodic_axes: tuple[bool, bool, bool], forward: bool) -> np.ndarray:
+    """Curl without PML computed from an explicitly padded field."""
+    pad = np.pad(field, ((0, 0), (1, 1), (1, 1), (1, 1)), mode="constant")
+    for axis, periodic in enumerate(periodic_axes):
+        if periodic:
+            wrapped = np.pad(field, [(0, 0)] + [(1, 1) if a == axis else (0, 0) for a in range(3)], mode="wrap")
+            index = [slice(None)] + [slice(None) if a == axis else slice(1, -1) for a in range(3)]
+            pad[tuple(index)] = wrapped
+    center = pad[:, 1:-1, 1:-1, 1:-1]
+
+    def diff(component: int, axis: int) -> np.ndarray:
+        index = [slice(1, -1)] * 3
+        index[axis] = slice(2, None) if forward else slice(None, -2)
+        neighbor = pad[component][tuple(index)]
+        return neighbor - center[component] if forward else center[component] - neighbor
+
+    return np.stack(
+        [
+            diff(2, 1) - diff(1, 2),
+            diff(0, 2) - diff(2, 0),
+            diff(1, 0) - diff(0, 1),
+        ],
+        axis=0,
+    )
+
+
+def test_curl_matches_padded_reference_for_all_boundaries():
+    """Test curl_E and curl_H against explicit padding for every periodic/PEC axis combination."""
+    rng = np.random.default_rng(42)
+    shape = (4, 5, 6)
+    field = rng.normal(size=(3, *shape)).astype(np.float32)
+    psi = jnp.zeros((6, *shape))
+    alpha = jnp.zeros((6, *shape))
+    kappa = jnp.ones((6, *shape))
+    sigma = jnp.zeros((6, *shape))
+    config = SimulationConfig(
+        time=400e-15,
+        resolution=1.0,
+        courant_factor=0.99,
+    )
+
+    for periodic_axes in itertools.product((False, True), repeat=3):
+        curl_e, _ = curl_E(config, jnp.asarray(field), psi, alpha, kappa, sigma, False, periodic_axes)
+        curl_h, _ = curl_H(config, jnp.asarray(field), psi, alpha, kappa, sigma, False, periodic_axes)
+
+        assert np.allclose(curl_e, _reference_curl(field, periodic_axes, forward=True), atol=1e-5)
+        assert np.allclose(curl_h, _reference_curl(field, periodic_axes, forward=False), atol=1e-5)
+
+
+def test_curl_low_precision_fields_keep_storage_dtype():
+    """Test that bfloat16 fields are evaluated in float32 and returned in bfloat16."""
+    rng = np.random.default_rng(0)
+    shape = (4, 5, 6)
+    field = jnp.asarray(rng.normal(size=(3, *shape)), dtype=jnp.bfloat16)
+    psi = jnp.zeros((6, *shape), dtype=jnp.bfloat16)
+    alpha = jnp.full((6, *shape), 0.1, dtype=jnp.bfloat16)
+    kappa = jnp.ones((6, *shape), dtype=jnp.bfloat16)
+    sigma = jnp.full((6, *shape), 0.5, dtype=jnp.bfloat16)
+    config = SimulationConfig(
+        time=400e-15,
+        resolution=1.0,
+        courant_factor=0.99,
+    )
+
+    for curl_fn in (curl_E, curl_H):
+        curl_low, psi_low = curl_fn(config, field, psi, alpha, kappa, sigma, True)
+        curl_ref, psi_ref = curl_fn(
+            config,
+            field.astype(jnp.float32),
+            psi.astype(jnp.float32),
+            alpha.astype(jnp.float32),
+            kappa.astype(jnp.float32),
+            sigma.astype(jnp.float32),
+            True,
+        )
+
+        assert curl_low.dtype == jnp.bfloat16
+        assert psi_low.dtype == jnp.bfloat16
+        assert jnp.array_equal(curl_low, curl_ref.astype(jnp.bfloat16))
+        assert jnp.array_equal(psi_low, psi_ref.astype(jnp.bfloat16))
@@ -6,6 +6,7 @@ from fdtdx.core.linalg import (
     get_single_directional_rotation_matrix,
     get_wave_vector_raw,
     rotate_vector,
+    rotate_vectors,
 )
 
 
@@ -199,3 +200,15 @@ def test_rotate_vector_combined_rotations():
 
     # Result should be normalized (assuming input was normalized)
     assert jnp.allclose(jnp.linalg.norm(result), 1.0, atol=1e-6)
+
+
+def test_rotate_vectors_matches_single_rotations():
+    """Test that batched rotation equals rotating each vector individually."""
+    vectors = jnp.array([[0.0, 0.0, -1.0], [1.0, 0.0, 0.0], [0.0, 2.0, 0.0]])
+    axes_tuple = (1, 2, 0)
+    azimuth, elevation = 0.3, -0.2
+    result = rotate_vectors(vectors, azimuth, elevation, axes_tuple)
+    assert result.shape == (3, 3)
+    for vector, rotated in zip(vectors, result):
+        assert jnp.allclose(rotated, rotate_vector(vector, azimuth, elevation, axes_tuple), atol=1e-6)
+    assert jnp.allclose(jnp.linalg.norm(result, axis=-1), jnp.linalg.norm(vectors, axis=-1), atol=1e-6)
@@ -0,0 +1,325 @@
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+import fdtdx
+from fdtdx.config import SimulationConfig
+from fdtdx.core.grid import calculate_time_offset_yee
+from fdtdx.core.linalg import get_single_directional_rotation_matrix, get_wave_vector_raw, rotate_vector
+from fdtdx.core.misc import linear_interpolated_indexing, normalize_polarization_for_source
+from fdtdx.core.physics.metrics import compute_energy
+from fdtdx.objects.sources.linear_polarization import _plane_basis
+
+TILT = {
+    "azimuth_angle": 12.0,
+    "elevation_angle": -7.0,
+    "max_angle_random_offset": 3.0,
+    "max_horizontal_offset": 100e-9,
+    "max_vertical_offset": 50e-9,
+}
+
+#: pytree leaves of a placed plane source, everything else is static
+PLACED_SOURCE_LEAVES = {
+    ".temporal_profile.num_startup_periods",
+    "._is_on_at_time_step_arr",
+    "._time_step_to_on_idx",
+    "._E",
+    "._H",
+    "._time_offset_E",
+    "._time_offset_H",
+}
+
+
+def _reference_rotate_vector(vector, azimuth_angle, elevation_angle, axes_tuple):
+    """Vector rotation as implemented before batching, applying the three basis changes one after another."""
+    horizontal_axis, vertical_axis, propagation_axis = axes_tuple
+    global_to_raw_basis = jnp.zeros((3, 3)).at[(0, 1, 2), (horizontal_axis, vertical_axis, propagation_axis)].set(1)
+    u = get_single_directional_rotation_matrix(1, azimuth_angle) @ jnp.asarray([1.0, 0.0, 0.0])
+    v = get_single_directional_rotation_matrix(0, elevation_angle) @ jnp.asarray([0.0, 1.0, 0.0])
+    w = jnp.cross(u, v)
+    w = w / jnp.linalg.norm(w)
+    rotation_basis = jnp.stack((u, v, w), axis=0)
+    rotated = global_to_raw_basis.T @ (rotation_basis @ (global_to_raw_basis @ vector))
+    return rotated / jnp.linalg.norm(rotated) * jnp.linalg.norm(vector)
+
+
+def _reference_amplitude(source, center):
+    """Amplitude profile in normal coordinates as implemented before vectorizing the gaussian profile."""
+    if isinstance(source, fdtdx.UniformPlaneSource):
+        return source.amplitude * jnp.ones(source.grid_shape, dtype=jnp.float32)
+    width, height = source.grid_shape[source.horizontal_axis], source.grid_shape[source.vertical_axis]
+    grid_radius = source.radius / source._config.resolution
+    grid = (jnp.stack(jnp.meshgrid(jnp.arange(height), jnp.arange(width), indexing="xy"), axis=-1) - center) / (
+        grid_radius
+    )
+    euc_dist = (grid**2).sum(axis=-1)
+    profile = jnp.where(euc_dist < 1, jnp.exp(-0.5 * euc_dist / source.std**2), 0)
+    profile = jnp.expand_dims(profile, axis=source.propagation_axis)
+    return profile / profile.sum()
+
+
+def _reference_EH(source, key, inv_permittivities, inv_permeabilities):
+    """E/H fields and time offsets with the per-point vmapped projection and interpolation"""
+    inv_permittivities = inv_permittivities[*source.grid_slice]
+    if isinstance(inv_permeabilities, jax.Array) and inv_permeabilities.ndim > 0:
+        inv_permeabilities = inv_permeabilities[*source.grid_slice]
+
+    e_pol_raw, h_pol_raw = normalize_polarization_for_source(
+        direction=source.direction,
+        propagation_axis=source.propagation_axis,
+        fixed_E_polarization_vector=source.fixed_E_polarization_vector,
+        fixed_H_polarization_vector=source.fixed_H_polarization_vector,
+    )
+    wave_vector_raw = get_wave_vector_raw(direction=source.direction, propagation_axis=source.propagation_axis)
+    center, azimuth, elevation = source._get_random_parts(key)
+
+    axes_tpl = (source.horizontal_axis, source.vertical_axis, source.propagation_axis)
+    wave_vector = _reference_rotate_vector(wave_vector_raw, azimuth, elevation, axes_tpl)
+    e_pol = _reference_rotate_vector(e_pol_raw, azimuth, elevation, axes_tpl)
+    h_pol = _reference_rotate_vector(h_pol_raw, azimuth, elevation, axes_tpl)
+
+    amplitude_raw = _reference_amplitude(source, center)[None, ...]
+    w, h = jnp.meshgrid(
+        jnp.arange(source.grid_shape[source.horizontal_axis]),
+        jnp.arange(source.grid_shape[source.vertical_axis]),
+        indexing="ij",
+    )
+    wh_indices = jnp.stack((w, h), axis=-1) - center
+    h_axis = jnp.zeros((3,)).at[source.horizontal_axis].set(1)
+    u_basis = h_axis - jnp.dot(h_axis, wave_vector) * wave_vector
+    u_basis = u_basis / jnp.linalg.norm(u_basis)
+    v_basis = jnp.cross(wave_vector, u_basis)
+
+    def project(point):
+        point_list = [point[0], point[1]]
+        point_list.insert(source.propagation_axis, 0)
+        point = jnp.asarray(point_list, dtype=jnp.float32)
+        projection = point - jnp.dot(point, wave_vector) * wave_vector
+        return jnp.asarray((jnp.dot(projection, u_basis), jnp.dot(projection, v_basis)), dtype=jnp.float32)
+
+    float_projected = jax.vmap(project)(wh_indices.reshape(-1, 2)) + center
+    interp = jax.vmap(linear_interpolated_indexing, in_axes=(0, None))(float_projected, amplitude_raw.squeeze())
+    amplitude = interp.reshape(*amplitude_raw.shape)
+
+    E = amplitude * e_pol[:, None, None, None]
+    H = amplitude * h_pol[:, None, None, None]
+    if source.normalize_by_energy:
+        energy = compute_energy(E=E, H=H, inv_permittivity=inv_permittivities, inv_permeability=inv_permeabilities)
+        E = E / jnp.sqrt(energy.sum())
+        H = H / jnp.sqrt(energy.sum())
+    H = H / jnp.sqrt(inv_permittivities / inv_permeabilities)
+
+    time_offset_E, time_offset_H = calculate_time_offset_yee(
+        center=center,
+        wave_vector=wave_vector,
+        inv_permittivities=inv_permittivities,
+        inv_permeabilities=inv_permeabilities,
+        resolution=source._config.resolution,
+        time_step_duration=source._config.time_step_duration,
+    )
+    return E, H, time_offset_E, time_offset_H
+
+
+def _assert_matches_reference(actual, expected):
+    for a, b in zip(actual, expected):
+        assert a.shape == b.shape
+        assert np.allclose(np.asarray(a, dtype=np.float32), b, rtol=0, atol=1e-5 * float(jnp.abs(b).max()))
+
+
+def _place(source, propagation_axis: int, plane_shape: tuple[int, int]):
+    """Places a source in a (14, 13, 12) grid with the given plane shape along horizontal and vertical axis."""
+    config = SimulationConfig(time=20e-15, resolution=100e-9, backend="cpu")
+    grid_slice = [(5, 6)] * 3
+    grid_slice[(propagation_axis + 1) % 3] = (1, 1 + plane_shape[0])
+    grid_slice[(propagation_axis + 2) % 3] = (2, 2 + plane_shape[1])
+    return source.place_on_grid(tuple(grid_slice), config, jax.random.PRNGKey(0))
+
+
+def _placed_uniform_source(**kwargs) -> fdtdx.UniformPlaneSource:
+    config = SimulationConfig(time=20e-15, resolution=100e-9, backend="cpu")
+    source = fdtdx.UniformPlaneSource(
+        wave_character=fdtdx.WaveCharacter(wavelength=1e-6),
+        direction="+",
+        fixed_E_polarization_vector=(1, 0, 0),
+        **kwargs,
+    )
+    return source.place_on_grid(((1, 10), (2, 11), (5, 6)), config, jax.random.PRNGKey(0))
+
+
+def test_source_geometry_is_static():
+    """Test that grid slice, direction and configuration are not pytree leaves of a placed source"""
+    source = _placed_uniform_source(azimuth_angle=10.0)
+    leaf_paths = {jax.tree_util.keystr(path) for path, _ in jax.tree_util.tree_flatten_with_path(source)[0]}
+
+    assert leaf_paths == PLACED_SOURCE_LEAVES
+
+
+def test_gaussian_source_parameters_are_static():
+    """Test that the configuration scalars of a gaussian source do not add pytree leaves"""
+    config = SimulationConfig(time=20e-15, resolution=100e-9, backend="cpu")
+    source = fdtdx.GaussianPlaneSource(
+        radius=300e-9,
+        std=0.4,
+        wave_character=fdtdx.WaveCharacter(wavelength=1e-6),
+        direction="-",
+        fixed_H_polarization_vector=(0, 1, 0),
+        normalize_by_energy=False,
+        field_dtype=jnp.bfloat16,
+    )
+    source = source.place_on_grid(((5, 6), (1, 10), (2, 12)), config, jax.random.PRNGKey(0))
+    leaf_paths = {jax.tree_util.keystr(path) for path, _ in jax.tree_util.tree_flatten_with_path(source)[0]}
+
+    assert leaf_paths == PLACED_SOURCE_LEAVES
+
+
+def test_get_EH_variation_with_source_as_jit_argument():
+    """Test that an applied source passed through jit yields the fields of the reference implementation"""
+    inv_permittivities = jnp.full((14, 13, 12), 0.5)
+    key = jax.random.PRNGKey(1)
+    source = _placed_uniform_source(**TILT).apply(key, inv_permittivities, 1.0)
+
+    jitted = jax.jit(lambda s, k: s.get_EH_variation(k, inv_permittivities, 1.0))(source, key)
+
+    assert all(a.shape == (3, 9, 9, 1) for a in jitted)
+    _assert_matches_reference(jitted, _reference_EH(source, key, inv_permittivities, 1.0))
+
+
+def test_get_EH_variation_matches_reference():
+    """Test E, H and time offsets of tilted, offset plane sources against the per-point reference implementation"""
+    rng = np.random.default_rng(1)
+    inv_permittivities = jnp.asarray(rng.uniform(0.2, 1.0, size=(14, 13, 12)), dtype=jnp.float32)
+    inv_permeabilities = jnp.asarray(rng.uniform(0.5, 1.0, size=(14, 13, 12)), dtype=jnp.float32)
+    wave_character = fdtdx.WaveCharacter(wavelength=1e-6)
+
+    cases = [
+        # (kind, propagation axis, direction, normalize_by_energy, fixed polarization, plane shape)
+        ("gauss", 0, "+", True, {"fixed_E_polarization_vector": (0, 1, 0)}, (10, 8)),
+        ("uniform", 0, "-", False, {"fixed_H_polarization_vector": (0, 0, 1)}, (10, 8)),
+        ("gauss", 1, "-", False, {"fixed_H_polarization_vector": (1, 0, 0)}, (9, 9)),
+        ("uniform", 1, "+", True, {"fixed_E_polarization_vector": (0, 0, 1)}, (9, 9)),
+        ("gauss", 2, "+", False, {"fixed_E_polarization_vector": (1, 0, 0)}, (10, 8)),
+        ("uniform", 2, "-", True, {"fixed_H_polarization_vector": (0, 1, 0)}, (8, 10)),
+    ]
+    for i, (kind, propagation_axis, direction, normalize, polarization, plane_shape) in enumerate(cases):
+        # the reference swaps horizontal and vertical plane coordinates for propagation along y, which only
+        # cancels for an untilted, centered source on a square plane
+        tilt = {} if propagation_axis == 1 else TILT
+        kwargs = dict(
+            wave_character=wave_character, direction=direction, normalize_by_energy=normalize, **tilt, **polarization
+        )
+        if kind == "gauss":
+            source = fdtdx.GaussianPlaneSource(radius=300e-9, **kwargs)
+        else:
+            source = fdtdx.UniformPlaneSource(amplitude=2.0, **kwargs)
+        source = _place(source, propagation_axis, plane_shape)
+
+        key = jax.random.PRNGKey(i)
+        for inv_mu in (1.0, inv_permeabilities):
+            _assert_matches_reference(
+                source.get_EH_variation(key, inv_permittivities, inv_mu),
+                _reference_EH(source, key, inv_permittivities, inv_mu),
+            )
+
+
+def test_gaussian_source_on_non_square_plane_along_y():
+    """Test that the profile of a source propagating along y keeps the (x, z) layout of a non-square plane"""
+    inv_permittivities = jnp.ones((14, 13, 12))
+    kwargs = {
+        "radius": 300e-9,
+        "wave_character": fdtdx.WaveCharacter(wavelength=1e-6),
+        "direction": "+",
+        "fixed_E_polarization_vector": (0, 0, 1),
+    }
+    # horizontal axis z with 9 cells, vertical axis x with 7 cells
+    source = _place(fdtdx.GaussianPlaneSource(**kwargs), 1, (9, 7))
+    fields = source.get_EH_variation(jax.random.PRNGKey(0), inv_permittivities, 1.0)
+
+    assert source.grid_shape == (7, 1, 9)
+    assert all(a.shape == (3, 7, 1, 9) for a in fields)
+    magnitude = np.abs(np.asarray(fields[0])).sum(axis=0)
+    assert np.unravel_index(magnitude.argmax(), magnitude.shape) == (3, 0, 4)
+
+    # a random center offset moves the profile along the matching axes
+    source = _place(
+        fdtdx.GaussianPlaneSource(max_horizontal_offset=100e-9, max_vertical_offset=50e-9, **kwargs), 1, (9, 7)
+    )
+    key = jax.random.PRNGKey(2)
+    center_horizontal, center_vertical = np.asarray(source._get_random_parts(key)[0])
+    magnitude = np.abs(np.asarray(source.get_EH_variation(key, inv_permittivities, 1.0)[0])).sum(axis=0)[:, 0, :]
+    x, z = np.meshgrid(np.arange(7), np.arange(9), indexing="ij")
+    assert np.isclose((magnitude * x).sum() / magnitude.sum(), center_vertical, atol=0.05)
+    assert np.isclose((magnitude * z).sum() / magnitude.sum(), center_horizontal, atol=0.05)
+
+
+def test_source_along_y_matches_relabeled_source_along_z():
+    """Test a tilted, offset source propagating along y against the same source along z with relabeled axes"""
+    rng = np.random.default_rng(2)
+    # (x, y, z) of the source along z become (z, x, y) of the source along y
+    inv_permittivities_z = jnp.asarray(rng.uniform(0.2, 1.0, size=(12, 9, 3)), dtype=jnp.float32)
+    inv_permittivities_y = inv_permittivities_z.transpose(1, 2, 0)
+    config = SimulationConfig(time=20e-15, resolution=100e-9, backend="cpu")
+    key = jax.random.PRNGKey(5)
+
+    def _fields(fixed_E_polarization_vector, grid_slice, inv_permittivities):
+        source = fdtdx.UniformPlaneSource(
+            wave_character=fdtdx.WaveCharacter(wavelength=1e-6),
+            direction="-",
+            fixed_E_polarization_vector=fixed_E_polarization_vector,
+            **TILT,
+        )
+        source = source.place_on_grid(grid_slice, config, jax.random.PRNGKey(0))
+        return source.get_EH_variation(key, inv_permittivities, 1.0)
+
+    along_z = _fields((1, 0, 0), ((1, 11), (1, 8), (1, 2)), inv_permittivities_z)
+    along_y = _fields((0, 0, 1), ((1, 8), (1, 2), (1, 11)), inv_permittivities_y)
+
+    for actual, expected in zip(along_y, along_z):
+        expected = jnp.asarray(expected)[jnp.asarray([1, 2, 0])].transpose(0, 2, 3, 1)
+        _assert_matches_reference(actual, expected)
+
+
+def test_field_dtype_bfloat16():
+    """Test bfloat16 source fields against the float32 default, which itself matches the reference"""
+    inv_permittivities = jnp.full((14, 13, 12), 0.5)
+    key = jax.random.PRNGKey(3)
+    results = {}
+    for field_dtype in (None, jnp.bfloat16):
+        kwargs = {} if field_dtype is None else {"field_dtype": field_dtype}
+        source = fdtdx.GaussianPlaneSource(
+            radius=300e-9,
+            wave_character=fdtdx.WaveCharacter(wavelength=1e-6),
+            direction="+",
+            fixed_E_polarization_vector=(1, 0, 0),
+            **TILT,
+            **kwargs,
+        )
+        source = _place(source, 2, (10, 8))
+        results[field_dtype] = (source.get_EH_variation(key, inv_permittivities, 1.0), source)
+
+    (E, H, time_offset_E, time_offset_H), source = results[None]
+    assert E.dtype == H.dtype == time_offset_E.dtype == time_offset_H.dtype == jnp.float32
+    _assert_matches_reference((E, H, time_offset_E, time_offset_H), _reference_EH(source, key, inv_permittivities, 1.0))
+
+    (E_low, H_low, time_offset_E_low, time_offset_H_low), _ = results[jnp.bfloat16]
+    assert E_low.dtype == H_low.dtype == jnp.bfloat16
+    assert time_offset_E_low.dtype == time_offset_H_low.dtype == jnp.float32
+    for low, full in ((E_low, E), (H_low, H)):
+        full_cast = full.astype(jnp.bfloat16).astype(jnp.float32)
+        assert np.allclose(low.astype(jnp.float32), full_cast, rtol=2e-2, atol=1e-3 * float(jnp.abs(full).max()))
+    assert jnp.array_equal(time_offset_E_low, time_offset_E)
+    assert jnp.array_equal(time_offset_H_low, time_offset_H)
+
+
+def test_plane_basis_matches_cross_product():
+    """Test the closed form plane basis against the general cross product for every axis at a tilted angle"""
+    for propagation_axis in range(3):
+        axes_tuple = ((propagation_axis + 1) % 3, (propagation_axis + 2) % 3, propagation_axis)
+        for direction in ("+", "-"):
+            wave_vector = rotate_vector(get_wave_vector_raw(direction, propagation_axis), 0.3, -0.2, axes_tuple)
+            u_basis, v_basis = _plane_basis(wave_vector, propagation_axis)
+
+            assert jnp.allclose(v_basis, jnp.cross(wave_vector, u_basis), atol=1e-6)
+            for a, b in ((u_basis, wave_vector), (v_basis, wave_vector), (u_basis, v_basis)):
+                assert jnp.abs(jnp.dot(a, b)) < 1e-6
+            assert jnp.allclose(jnp.linalg.norm(u_basis), 1.0, atol=1e-6)
+            assert jnp.allclose(jnp.linalg.norm(v_basis), 1.0, atol=1e-6)